@@ -51,6 +51,15 @@
 # How many characters need to be processed before the first start-of-packet
 # marker is detected?
 
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # the vectorized engine is optional
+    np = None
+
+
 def load_buffer(file_path):
     """
     Load in the input buffer.
@@ -89,7 +98,7 @@ def first_start_of_marker(file_path, start_of_message=False):
     count_char = -1  # if there is no marker available, return -1
     buffer = load_buffer(file_path)
 
-    for i in range(len(buffer)-marker_len):
+    for i in range(len(buffer)-marker_len+1):
         marker = buffer[i:i+marker_len]
 
         # determine if there are repeat characters in the marker
@@ -104,6 +113,360 @@ def first_start_of_marker(file_path, start_of_message=False):
     return count_char
 
 
+def read_chunks(source, chunk_size=65536):
+    """
+    Reads a datastream in fixed-size chunks.
+
+    Inputs:
+        source (str or file): file path, "-" for stdin, or a binary file object
+        chunk_size (int): number of bytes to read at a time
+
+    Returns:
+        (generator): yields chunks of bytes until the stream is exhausted
+    """
+
+    if source == "-":
+        f = sys.stdin.buffer
+    elif isinstance(source, str):
+        f = open(source, "rb")
+    else:
+        f = source
+
+    try:
+        chunk = f.read(chunk_size)
+        while chunk:
+            yield chunk
+            chunk = f.read(chunk_size)
+    finally:
+        if isinstance(source, str) and source != "-":
+            f.close()
+
+
+def check_marker_len(marker_len):
+    """
+    Checks that a marker length is usable; a marker needs at least one
+        character.
+
+    Inputs:
+        marker_len (int): number of distinct characters making up a marker
+
+    Raises:
+        ValueError: if the marker length is not positive
+    """
+
+    if marker_len <= 0:
+        raise ValueError(
+            "marker length must be positive, got {}".format(marker_len))
+
+
+def stream_start_of_marker(source, marker_len=4, chunk_size=65536):
+    """
+    Determines the number of characters needed to be processed to get the
+        first start of marker, reading the datastream in chunks and stopping
+        as soon as the marker completes.
+
+    Only the position each byte value was last seen at is carried across chunk
+        boundaries, which covers the last marker_len-1 bytes of the window, so
+        memory stays constant no matter how long the stream is.
+
+    Inputs:
+        source (str or file): file path, "-" for stdin, or a binary file object
+        marker_len (int): number of distinct characters making up a marker
+        chunk_size (int): number of bytes to read at a time
+
+    Returns:
+        (int): absolute offset of the end of the first marker, -1 if there
+            is no marker in the stream
+
+    Raises:
+        ValueError: if the marker length is not positive
+    """
+
+    check_marker_len(marker_len)
+    last_seen = [-1] * 256  # last absolute position of each byte value
+    start = 0  # absolute position where the current distinct run begins
+    offset = 0  # absolute position of the first byte of the current chunk
+
+    for chunk in read_chunks(source, chunk_size):
+        for i, c in enumerate(chunk):
+            pos = offset + i
+            if last_seen[c] >= start:
+                start = last_seen[c] + 1
+            last_seen[c] = pos
+
+            if pos - start + 1 == marker_len:
+                return pos + 1
+        offset += len(chunk)
+
+    return -1
+
+
+def stream_start_of_markers(source, marker_lens=(4, 14), chunk_size=65536):
+    """
+    Determines the first start of marker for several marker lengths in a
+        single pass over the datastream.
+
+    Every marker length shares the same distinct run: the number of distinct
+        characters ending at the current position. The run grows by at most one
+        per byte, so markers complete in order of increasing length and only
+        the shortest pending length needs to be checked.
+
+    Inputs:
+        source (str or file): file path, "-" for stdin, or a binary file object
+        marker_lens (iterable): marker lengths to search for
+        chunk_size (int): number of bytes to read at a time
+
+    Returns:
+        (dict): maps each marker length to the absolute offset of the end of
+            its first marker, -1 if there is no such marker in the stream
+
+    Raises:
+        ValueError: if any marker length is not positive
+    """
+
+    pending = sorted(set(marker_lens))
+    for marker_len in pending:
+        check_marker_len(marker_len)
+
+    found = {marker_len: -1 for marker_len in pending}
+    if len(pending) == 0:
+        return found
+
+    last_seen = [-1] * 256  # last absolute position of each byte value
+    start = 0  # absolute position where the current distinct run begins
+    offset = 0  # absolute position of the first byte of the current chunk
+    k = 0  # index of the shortest marker length not yet found
+
+    for chunk in read_chunks(source, chunk_size):
+        for i, c in enumerate(chunk):
+            pos = offset + i
+            if last_seen[c] >= start:
+                start = last_seen[c] + 1
+            last_seen[c] = pos
+
+            if pos - start + 1 == pending[k]:
+                found[pending[k]] = pos + 1
+                k += 1
+                if k == len(pending):
+                    return found
+        offset += len(chunk)
+
+    return found
+
+
+def iter_marker_ends(source, marker_len=4, chunk_size=65536):
+    """
+    Finds every position in the datastream where a marker ends, that is,
+        where the last marker_len characters are all different.
+
+    Inputs:
+        source (str or file): file path, "-" for stdin, or a binary file object
+        marker_len (int): number of distinct characters making up a marker
+        chunk_size (int): number of bytes to read at a time
+
+    Returns:
+        (generator): yields the number of characters processed at the end of
+            each marker, in increasing order
+
+    Raises:
+        ValueError: if the marker length is not positive
+    """
+
+    check_marker_len(marker_len)  # before the generator starts running
+    return _marker_ends(source, marker_len, chunk_size)
+
+
+def _marker_ends(source, marker_len, chunk_size):
+    """
+    Helper generator for iter_marker_ends.
+
+    Inputs:
+        source (str or file): file path, "-" for stdin, or a binary file object
+        marker_len (int): number of distinct characters making up a marker
+        chunk_size (int): number of bytes to read at a time
+
+    Returns:
+        (generator): yields the number of characters processed at the end of
+            each marker, in increasing order
+    """
+
+    last_seen = [-1] * 256  # last absolute position of each byte value
+    start = 0  # absolute position where the current distinct run begins
+    offset = 0  # absolute position of the first byte of the current chunk
+
+    for chunk in read_chunks(source, chunk_size):
+        for i, c in enumerate(chunk):
+            pos = offset + i
+            if last_seen[c] >= start:
+                start = last_seen[c] + 1
+            last_seen[c] = pos
+
+            if pos - start + 1 >= marker_len:
+                yield pos + 1
+        offset += len(chunk)
+
+
+def marker_histogram(source, marker_len=4, block_size=1 << 20,
+                     chunk_size=65536):
+    """
+    Counts the markers ending in each fixed-size block of the datastream,
+        without keeping the marker positions around.
+
+    Inputs:
+        source (str or file): file path, "-" for stdin, or a binary file object
+        marker_len (int): number of distinct characters making up a marker
+        block_size (int): number of characters covered by each block
+        chunk_size (int): number of bytes to read at a time
+
+    Returns:
+        (list): count of markers per block, where block b covers markers
+            ending after characters b*block_size+1 through (b+1)*block_size,
+            up to the last block containing a marker
+
+    Raises:
+        ValueError: if the marker length is not positive
+    """
+
+    counts = []
+    for end in iter_marker_ends(source, marker_len, chunk_size):
+        block = (end - 1) // block_size
+        while len(counts) <= block:
+            counts.append(0)
+        counts[block] += 1
+
+    return counts
+
+
+def marker_run_lengths(buffer):
+    """
+    Computes, for every position in the buffer, how many characters ending at
+        that position are all different.
+
+    The previous occurrence of each byte is found with a stable sort by byte
+        value; a running maximum of those positions then gives where the
+        distinct run ending at each position starts.
+
+    Inputs:
+        buffer (ndarray): uint8 array holding the buffer
+
+    Returns:
+        (ndarray): int32 (int64 for buffers of 2GB or more) array of distinct
+            run lengths, one per position
+    """
+
+    if np is None:
+        raise ImportError("numpy is required for the vectorized engine")
+
+    n = len(buffer)
+    index_type = np.int32 if n < 2**31 - 1 else np.int64
+    order = np.argsort(buffer, kind="stable").astype(index_type, copy=False)
+    values = buffer[order]  # radix sort for uint8
+
+    # one past the previous position holding the same byte, 0 if none
+    after_prev = np.zeros(n, dtype=index_type)
+    same = np.flatnonzero(values[1:] == values[:-1]) + 1
+    after_prev[order[same]] = order[same - 1] + 1
+    del order, values, same
+
+    starts = np.maximum.accumulate(after_prev, out=after_prev)
+    return np.arange(1, n + 1, dtype=index_type) - starts
+
+
+# longest marker searched with shifted comparisons; each extra character
+# costs a pass over the block, so longer markers use marker_run_lengths
+SHIFTED_MAX_LEN = 128
+
+
+def _window_repeats(block, marker_len):
+    """
+    Helper function for first_start_of_marker_vectorized. Determines, for
+        every position in a block, whether the marker_len characters ending
+        there hold a repeated character, by comparing the block with shifted
+        views of itself.
+
+    With same_d marking characters equal to the one d places earlier, the
+        window ending at i has a repeat when same_d is set anywhere in its
+        last marker_len-d positions. Building that up one distance at a time
+        takes one comparison and two ORs per distance.
+
+    Inputs:
+        block (ndarray): uint8 array holding part of the buffer
+        marker_len (int): number of distinct characters making up a marker
+
+    Returns:
+        (ndarray): bool array, True where the window ending there holds a
+            repeated character; only meaningful from position marker_len-1 on
+    """
+
+    n = len(block)
+    repeated = np.zeros(n, dtype=np.bool_)
+    same = np.zeros(n, dtype=np.bool_)
+    for d in range(1, marker_len):
+        np.equal(block[d:], block[:-d], out=same[d:])
+        same[1:] |= repeated[:-1]  # shorter distances, one window back
+        repeated |= same
+
+    return repeated
+
+
+def first_start_of_marker_vectorized(buffer, marker_len=4, block_size=1 << 20):
+    """
+    Determines number of characters needed to be processed to get the first
+        start of marker from a buffer, using NumPy array operations.
+
+    The buffer is processed in blocks that overlap by marker_len-1 characters,
+        so memory is bounded by the block size and the search stops at the
+        first block containing a marker. A file is memory-mapped rather than
+        read, so only the blocks searched are loaded. Markers up to
+        SHIFTED_MAX_LEN characters are found by comparing shifted views of
+        each block, longer ones from marker_run_lengths.
+
+    Inputs:
+        buffer (str or ndarray): file path containing the input buffer, or a
+            uint8 array holding the buffer
+        marker_len (int): number of distinct characters making up a marker
+        block_size (int): number of characters to search at a time
+
+    Returns:
+        (int): number of characters needed to be processed to find start
+            of marker, -1 if there is no marker
+
+    Raises:
+        ValueError: if the marker length is not positive
+    """
+
+    check_marker_len(marker_len)
+    if np is None:
+        raise ImportError("numpy is required for the vectorized engine")
+
+    if marker_len > 256:  # more characters than there are byte values
+        return -1
+
+    if isinstance(buffer, str):
+        if os.path.getsize(buffer) == 0:
+            return -1
+        buffer = np.memmap(buffer, dtype=np.uint8, mode="r")
+
+    for block_start in range(0, len(buffer), block_size):
+        # include the characters before the block that a marker can span
+        lo = max(0, block_start - (marker_len - 1))
+        block = np.asarray(buffer[lo:block_start + block_size])
+
+        # only windows lying wholly inside the buffer can be markers
+        first_end = max(block_start, marker_len - 1)
+        if marker_len <= SHIFTED_MAX_LEN:
+            hits = ~_window_repeats(block, marker_len)[first_end - lo:]
+        else:
+            hits = marker_run_lengths(block)[first_end - lo:] >= marker_len
+
+        if len(hits) > 0:
+            first = int(np.argmax(hits))
+            if hits[first]:
+                return first_end + first + 1
+
+    return -1
+
+
 # --- Part Two ---
 # Your device's communication system is correctly detecting packets, but still
 # isn't working. It looks like it also needs to look for messages.
@@ -133,9 +496,10 @@ def main():
     """
 
     file_path = "data/day6-input.txt"
+    markers = stream_start_of_markers(file_path, (4, 14))
 
     # Part 1 - start-of-packet marker (4 characters)
-    print(first_start_of_marker(file_path))
+    print(markers[4])
 
     # Part 2 - start-of-message marker (14 characters)
-    print(first_start_of_marker(file_path, True))
+    print(markers[14])
@@ -101,8 +101,13 @@
 # Find all of the directories with a total size of at most 100000. What is the
 # sum of the total sizes of those directories?
 
+import concurrent.futures
+import mmap
+import os
+
 from dir_structure import Directory
 from dir_structure import File
+from dir_structure import SizeIndex
 
 
 def load_input(file_path):
@@ -116,56 +121,161 @@ def load_input(file_path):
         (Directory): directory structure
     """
 
-    cur_dir = None
-    cur_path = ""
-    main_dir = None
-    files = []
-
     with open(file_path, "r") as i:
-        for line in i:
-
-            # if the line if a command
-            if "$" in line:
-
-                # take all of the files from ls and add them to current directory
-                if (len(files) > 0):
-                    add_files(cur_dir, files)
-                    files = []
-
-                # if we're changing our current directory
-                if "cd" in line:
-                    dir_name = line.split()[-1]
-
-                    # if we're moving back to the main directory
-                    if (dir_name == "/"):
-                        if main_dir == None:  # initializing the main directory
-                            main_dir = Directory("Main")
-                        cur_dir = main_dir
-                        cur_path = "Main/"
-
-                    # if we're moving back one level
-                    elif dir_name == "..":
-
-                        # an ugly way to get 1-level up path
-                        cur_path = \
-                            cur_path[:-1][::-1][cur_path[:-1]
-                                                [::-1].index("/"):][::-1]
-                        cur_dir = main_dir.get_directory(cur_path)
-
-                    # if we're moving into a subdirectory
-                    else:
-                        cur_path += dir_name + "/"
-                        cur_dir = main_dir.get_directory(cur_path)
-
-            # take note of listed files
-            else:
-                files.append(line)
-
-        if len(files) > 0:
-            add_files(cur_dir, files)
+        return parse_terminal_output(i)
+
+
+def parse_terminal_output(lines):
+    """
+    Builds a directory structure from terminal output, keeping a reference to
+        the current directory rather than its path so that each line is
+        handled with a single lookup.
+
+    Inputs:
+        lines (iterable): lines of terminal output
+
+    Returns:
+        (Directory): directory structure
+    """
+
+    main_dir = Directory("Main")
+    cur_dir = main_dir
+
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 0:
+            continue
+
+        # if the line is a command
+        if parts[0] == "$":
+
+            # if we're changing our current directory
+            if parts[1] == "cd":
+                dir_name = parts[2]
+
+                # if we're moving back to the main directory
+                if dir_name == "/":
+                    cur_dir = main_dir
+
+                # if we're moving back one level
+                elif dir_name == "..":
+                    if cur_dir.parent is not None:
+                        cur_dir = cur_dir.parent
+
+                # if we're moving into a subdirectory
+                else:
+                    subdir = cur_dir.get_subdirectory(dir_name)
+                    if subdir is None:  # moving into a directory not listed
+                        subdir = Directory(dir_name)
+                        cur_dir.add_directory(subdir)
+                    cur_dir = subdir
+
+        # take note of listed files and directories
+        elif parts[0] == "dir":
+            cur_dir.add_directory(Directory(parts[1]))
+
+        else:
+            cur_dir.add_file(File(int(parts[0]), parts[1]))
+
+    return main_dir
+
+
+def load_input_parallel(file_path, processes=None, segments=None):
+    """
+    Load the input commands, parsing segments of the input in parallel.
+
+    Every "$ cd /" resets the current directory, so the input is split at
+        those commands into segments that can be parsed independently. Each
+        segment is parsed in a process pool, and each worker sends back its
+        partial directory structure as a flat listing (see Directory.listing),
+        so deep structures aren't pickled recursively. The listings are
+        merged by path into one structure.
+
+    Inputs:
+        file_path (str): the file path containing the input
+        processes (int, optional): number of worker processes
+        segments (int, optional): number of segments to aim for; defaults to
+            four per worker process
+
+    Returns:
+        (Directory): directory structure
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if segments is None:
+        segments = 4 * processes
+
+    bounds = split_at_root(file_path, segments)
+    main_dir = Directory("Main")
+
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        for listing in pool.map(_parse_segment, [file_path] * len(bounds),
+                                *zip(*bounds)):
+            main_dir.merge_listing(listing)
+
     return main_dir
 
 
+def split_at_root(file_path, segments):
+    """
+    Splits the input into roughly equal segments, each starting at a
+        "$ cd /" command (except the first, which starts at the beginning).
+
+    Inputs:
+        file_path (str): the file path containing the input
+        segments (int): number of segments to aim for
+
+    Returns:
+        (list): list of (start, end) byte offsets of each segment
+    """
+
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return [(0, 0)]
+
+    starts = [0]
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            for k in range(1, segments):
+                pos = max(k * size // segments, starts[-1])
+
+                # find the next "$ cd /" line at or after the target
+                while True:
+                    pos = m.find(b"\n$ cd /", pos)
+                    if pos == -1 or m[pos+7:pos+8] in (b"\n", b"\r", b""):
+                        break
+                    pos += 1
+
+                if pos == -1:
+                    break
+                if pos + 1 > starts[-1]:
+                    starts.append(pos + 1)
+
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _parse_segment(file_path, start, end):
+    """
+    Helper function for load_input_parallel. Parses one segment of the input.
+
+    Inputs:
+        file_path (str): the file path containing the input
+        start (int): byte offset where the segment starts
+        end (int): byte offset where the segment ends
+
+    Returns:
+        (list): flat listing of the partial directory structure, see
+            Directory.listing
+    """
+
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        lines = f.read(end - start).decode().splitlines()
+
+    return parse_terminal_output(lines).listing()
+
+
 def add_files(directory, lst):
     """
     Populates a directory with File and Directory objects.
@@ -199,13 +309,12 @@ def find_dir_size(directory, threshold=100000):
     """
 
     sum = 0
-    if directory.num_subdirectories() > 0:
 
-        # recursively traverse subdirectories
-        for d in directory.subdirectories:
-            if d.get_size() <= threshold:
-                sum += d.get_size()
-            sum += find_dir_size(d, threshold)
+    # traverse subdirectories, skipping the directory itself
+    for d, depth in directory.walk_preorder():
+        size = d.get_size()
+        if depth > 0 and size <= threshold:
+            sum += size
 
     return sum
 
@@ -251,13 +360,11 @@ def find_dir_to_delete(directory, needed, cur):
             space needed
     """
 
-    if (directory.num_subdirectories() > 0):
-
-        for d in directory.subdirectories:
-            if d.get_size() >= needed and d.get_size() < cur:
-                cur = d.get_size()
-
-            cur = find_dir_to_delete(d, needed, cur)
+    # traverse subdirectories, skipping the directory itself
+    for d, depth in directory.walk_preorder():
+        size = d.get_size()
+        if depth > 0 and size >= needed and size < cur:
+            cur = size
 
     return cur
 
@@ -274,13 +381,13 @@ def main():
 
     file_path = "data/day7-input.txt"
     main = load_input(file_path)
-    main.update_size()
+    index = SizeIndex.from_directory(main)
 
     # Part 1 - total size of directories with size <= 100,000
-    print(find_dir_size(main))
+    print(index.sum_at_most(100000))
 
     # Part 2 - size of directory needed to delete
     total_disk_size = 70000000
     unused = total_disk_size - main.get_size()
     needed = 30000000 - unused
-    print(find_dir_to_delete(main, needed, main.get_size()))
+    print(index.smallest_at_least(needed, main.get_size()))
@@ -42,6 +42,19 @@
 
 # Consider your map; how many trees are visible from outside the grid?
 
+import concurrent.futures
+import mmap
+import operator
+import os
+import tempfile
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # the array engine is optional
+    np = None
+
+
 def load_input(file_path):
     """
     Load the input file to get the tree grid.
@@ -140,6 +153,232 @@ def calc_visible_trees(grid):
     return count
 
 
+# Each direction is given as the (row, column) step taken when walking from
+# the edge of the grid toward the trees being looked at; e.g. (0, 1) walks
+# each row left to right, which is looking at the trees from the left.
+ORTHOGONAL_STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# diagonal directions; (1, -1) and (-1, 1) walk the anti-diagonals
+DIAGONAL_STEPS = ((1, 1), (-1, -1), (1, -1), (-1, 1))
+ALL_STEPS = ORTHOGONAL_STEPS + DIAGONAL_STEPS
+
+
+def running_max(heights):
+    """
+    Finds the tallest tree before each tree in a line.
+
+    Inputs:
+        heights (list): heights of the trees in the line
+
+    Returns:
+        (list): height of the tallest earlier tree for each tree, -1 if
+            there is none
+    """
+
+    tallest = -1
+    before = []
+    for tree in heights:
+        before.append(tallest)
+        tallest = max(tallest, tree)
+
+    return before
+
+
+def line_distances(heights):
+    """
+    Determines how many trees each tree in a line can see looking back toward
+        the start of the line. A monotonic stack keeps the trees that can
+        still block a view, so every tree is pushed and popped at most once.
+
+    Inputs:
+        heights (list): heights of the trees in the line
+
+    Returns:
+        (list): viewing distance of each tree
+    """
+
+    distances = []
+    stack = []  # (height, index), heights decreasing
+    for k, tree in enumerate(heights):
+        while stack and stack[-1][0] < tree:
+            stack.pop()
+
+        # blocked by the tree on top of the stack, or sees to the start
+        distances.append(k - stack[-1][1] if stack else k)
+        stack.append((tree, k))
+
+    return distances
+
+
+def visibility_map(grid, steps=ORTHOGONAL_STEPS):
+    """
+    Determines which trees are visible from outside the grid, with one sweep
+        per direction keeping the running maximum height seen so far.
+
+    Rows are swept by index with a single running maximum, stopping once
+        the tallest tree in the grid is reached since nothing behind it can be
+        seen. Other directions go through the grid row by row, keeping one
+        running maximum per column; diagonal ones shift those maximums by a
+        column each row.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+        steps (tuple): directions to look from, see ORTHOGONAL_STEPS
+
+    Returns:
+        (list): list of list of bools, True where a tree is visible
+    """
+
+    n_rows = len(grid)
+    n_cols = len(grid[0]) if n_rows > 0 else 0
+    visible = [[False] * n_cols for _ in range(n_rows)]
+    top = max((max(row) for row in grid if row), default=-1)
+
+    for di, dj in steps:
+        if di == 0:  # along each row
+            cols = range(n_cols) if dj == 1 else range(n_cols-1, -1, -1)
+            for row, visible_row in zip(grid, visible):
+                tallest = -1
+                for j in cols:
+                    tree = row[j]
+                    if tree > tallest:
+                        visible_row[j] = True
+                        tallest = tree
+                        if tree == top:
+                            break
+            continue
+
+        rows = list(zip(grid, visible))
+        if di == -1:
+            rows.reverse()
+
+        tallest = [-1] * n_cols  # running maximum of the line in each column
+        for row, visible_row in rows:
+            if dj == 1:
+                tallest = [-1] + tallest[:-1]
+            elif dj == -1:
+                tallest = tallest[1:] + [-1]
+
+            for j, tree in enumerate(row):
+                if tree > tallest[j]:
+                    visible_row[j] = True
+                    tallest[j] = tree
+
+            if dj == 0 and min(tallest) == top:
+                break  # every column has reached the tallest tree
+
+    return visible
+
+
+def calc_visible_trees_sweep(grid):
+    """
+    Determines number of trees that are visible at the edges of the forest,
+        using four directional sweeps rather than looking outward from each
+        tree.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+
+    Returns:
+        (int): count of visible trees
+    """
+
+    return sum(sum(row) for row in visibility_map(grid))
+
+
+def calc_visible_trees_eight(grid):
+    """
+    Determines number of trees that are visible from outside the grid when
+        also looking along the diagonals, using eight directional sweeps.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+
+    Returns:
+        (int): count of visible trees
+    """
+
+    return sum(sum(row) for row in visibility_map(grid, ALL_STEPS))
+
+
+# translation tables turning a row of digits into a binary string with a 1
+# wherever the tree is at least a given height
+HEIGHT_TABLES = [str.maketrans("0123456789", "0" * h + "1" * (10 - h))
+                 for h in range(10)]
+
+
+def height_bitsets(line):
+    """
+    Encodes a line of trees as bitsets, one per height: bit k of bitset h is
+        set if the k-th tree is at least h tall.
+
+    Inputs:
+        line (str or list): heights of the trees in the line, as a string of
+            digits or a list of ints
+
+    Returns:
+        (list): ten Python int bitsets, for heights 0 to 9
+    """
+
+    if not isinstance(line, str):
+        line = "".join(str(tree) for tree in line)
+    if line == "":
+        return [0] * 10
+
+    line = line[::-1]  # bit 0 is the first tree
+    return [int(line.translate(table), 2) for table in HEIGHT_TABLES]
+
+
+def visible_bits(bitsets):
+    """
+    Determines which trees in a line are visible from either end of the
+        line. Looking from the start, a tree of height h is visible exactly
+        when it is the first tree at least h tall, i.e. the lowest set bit of
+        bitset h; looking from the end, it is the highest set bit.
+
+    Inputs:
+        bitsets (list): bitsets of the line, from height_bitsets
+
+    Returns:
+        (int): bitset of the visible trees
+    """
+
+    visible = 0
+    for bits in bitsets:
+        if bits:
+            visible |= (bits & -bits) | (1 << (bits.bit_length() - 1))
+
+    return visible
+
+
+def calc_visible_trees_bitset(grid):
+    """
+    Determines number of trees that are visible at the edges of the forest,
+        working on whole rows and columns at a time as per-height bitsets.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+
+    Returns:
+        (int): count of visible trees
+    """
+
+    rows = ["".join(str(tree) for tree in row) for row in grid]
+    columns = ["".join(column) for column in zip(*rows)]
+    visible = [visible_bits(height_bitsets(row)) for row in rows]
+
+    # at most 20 trees per column are visible from the top or bottom, so move
+    # them into the row bitsets one at a time
+    for j, column in enumerate(columns):
+        bits = visible_bits(height_bitsets(column))
+        while bits:
+            low = bits & -bits
+            visible[low.bit_length() - 1] |= 1 << j
+            bits ^= low
+
+    return sum(bin(bits).count("1") for bits in visible)
+
+
 # --- Part Two ---
 # Content with the amount of tree cover available, the Elves just need to know
 # the best spot to build their tree house: they would like to be able to see a
@@ -267,6 +506,585 @@ def calculate_max_scenic_score(grid):
     return max_score
 
 
+def _look_back_products(rows, n_cols, diagonals=False):
+    """
+    Helper function for scenic_score_map. Multiplies together how many trees
+        each tree can see looking back toward the start of its row and its
+        column, and along both diagonals through the rows already seen if
+        asked, going through the rows in order.
+
+    Since heights are 0-9, each line keeps a table of the last position of a
+        tree at least h tall for every height h, so a viewing distance is one
+        lookup and a tree updates the table entries up to its own height.
+
+    Inputs:
+        rows (iterable): rows of tree heights, in the order to go through them
+        n_cols (int): number of columns in the grid
+        diagonals (bool): also look back along the diagonals
+
+    Returns:
+        (generator): yields a list of products for each row
+    """
+
+    # entry h of a column's list is (j,) * (h+1), assigned over a table
+    column_fills = [[(j,) * (h+1) for h in range(10)] for j in range(n_cols)]
+    ups = [[0] * 10 for _ in range(n_cols)]
+    up_lefts = [[0] * 10 for _ in range(n_cols)]
+    up_rights = [[0] * 10 for _ in range(n_cols)]
+
+    for i, row in enumerate(rows):
+        row_fills = [(i,) * (h+1) for h in range(10)]
+        left = [0] * 10
+        products = []
+
+        if not diagonals:
+            for j, tree, up, fills in zip(range(n_cols), row, ups,
+                                          column_fills):
+                products.append((j - left[tree]) * (i - up[tree]))
+                left[:tree+1] = fills[tree]
+                up[:tree+1] = row_fills[tree]
+
+        else:
+            # each diagonal line moves over by a column every row
+            up_lefts = [[i] * 10] + up_lefts[:-1]
+            up_rights = up_rights[1:] + [[i] * 10]
+            for j, tree, up, up_left, up_right, fills in zip(
+                    range(n_cols), row, ups, up_lefts, up_rights,
+                    column_fills):
+                products.append((j - left[tree]) * (i - up[tree])
+                                * (i - up_left[tree]) * (i - up_right[tree]))
+                left[:tree+1] = fills[tree]
+                up[:tree+1] = up_left[:tree+1] = up_right[:tree+1] = \
+                    row_fills[tree]
+
+        yield products
+
+
+def scenic_score_map(grid, diagonals=False):
+    """
+    Calculates the scenic score of every tree in the grid, multiplying
+        together its viewing distances in each direction. One pass goes
+        through the grid looking up and left, and a second goes through the
+        grid turned around, looking down and right, multiplying into the
+        scores from the first.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+        diagonals (bool): also look along the diagonals
+
+    Returns:
+        (list): list of list of scenic scores
+    """
+
+    n_cols = len(grid[0]) if grid else 0
+    scores = list(_look_back_products(grid, n_cols, diagonals))
+
+    turned = (row[::-1] for row in reversed(grid))
+    for score_row, products in zip(reversed(scores),
+                                   _look_back_products(turned, n_cols,
+                                                       diagonals)):
+        score_row[:] = map(operator.mul, score_row, reversed(products))
+
+    return scores
+
+
+def calculate_max_scenic_score_sweep(grid):
+    """
+    Calculates the maximum scenic score of any tree in the grid, finding
+        viewing distances in two sweeps over the grid rather than walking out
+        from each tree.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+
+    Returns:
+        (int): maximum scenic score
+    """
+
+    return max((max(row, default=0) for row in scenic_score_map(grid)),
+               default=0)
+
+
+def _grid_layout(data):
+    """
+    Helper function for load_input_array and map_input. Works out how the
+        rows of a grid file are laid out, checking that every row has the
+        same width and ends in the same line ending, "\n" or "\r\n".
+        Trailing line endings at the end of the file are ignored.
+
+    Inputs:
+        data (bytes or mmap): contents of the grid file
+
+    Returns:
+        (int, int, int): tuple, number of rows, width of each row and length
+            of the line ending
+
+    Raises:
+        ValueError: if the rows have different widths or line endings
+    """
+
+    size = len(data)
+    while size > 0 and data[size-1] in b"\r\n":  # trailing line endings
+        size -= 1
+    if size == 0:
+        return 0, 0, 1
+
+    width = data.find(b"\n", 0, size)
+    eol = 1  # length of the line ending
+    if width == -1:  # a single row
+        return 1, size, eol
+    if width > 0 and data[width-1] == ord("\r"):
+        width -= 1
+        eol = 2
+
+    n_rows, extra = divmod(size + eol, width + eol)
+    if extra != 0:
+        raise ValueError("grid rows must all be {} trees wide and end the "
+                         "same way".format(width))
+
+    # the line ending after every row but the last, seen through the stride
+    endings = np.ndarray((n_rows-1, eol), dtype=np.uint8, buffer=data,
+                         offset=width, strides=(width+eol, 1))
+    if not (endings == np.frombuffer(b"\r\n"[-eol:], dtype=np.uint8)).all():
+        raise ValueError("grid rows must all be {} trees wide and end the "
+                         "same way".format(width))
+
+    return n_rows, width, eol
+
+
+def load_input_array(file_path):
+    """
+    Load the input file straight into a NumPy array of tree heights. Like
+        map_input, the rows are viewed in place with the line ending as part
+        of the row stride, so the only copy made is subtracting "0".
+
+    Inputs:
+        file_path (str): file path where the input is located
+
+    Returns:
+        (ndarray): 2D uint8 array of tree heights
+
+    Raises:
+        ValueError: if the rows have different widths or line endings
+    """
+
+    if np is None:
+        raise ImportError("numpy is required for the array engine")
+
+    with open(file_path, "rb") as f:
+        raw = f.read()
+
+    n_rows, width, eol = _grid_layout(raw)
+    if n_rows == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    digits = np.ndarray((n_rows, width), dtype=np.uint8, buffer=raw,
+                        strides=(width+eol, 1))
+
+    return digits - np.uint8(ord("0"))
+
+
+def _visible_from_start(heights):
+    """
+    Helper function for visibility_array. Determines which trees are visible
+        looking along each row from column 0.
+
+    Inputs:
+        heights (ndarray): 2D int16 array of tree heights
+
+    Returns:
+        (ndarray): 2D bool array, True where a tree is visible
+    """
+
+    tallest = np.maximum.accumulate(heights, axis=1)
+    before = np.empty_like(tallest)
+    before[:, 0] = -1
+    before[:, 1:] = tallest[:, :-1]
+
+    return heights > before
+
+
+def visibility_array(grid):
+    """
+    Determines which trees are visible from outside the grid, using running
+        maximums along each axis in both directions.
+
+    Inputs:
+        grid (ndarray): 2D array of tree heights
+
+    Returns:
+        (ndarray): 2D bool array, True where a tree is visible
+    """
+
+    heights = np.asarray(grid, dtype=np.int16)
+    if heights.size == 0:
+        return np.zeros(heights.shape, dtype=bool)
+
+    return (_visible_from_start(heights)  # from the left
+            | _visible_from_start(heights[:, ::-1])[:, ::-1]  # right
+            | _visible_from_start(heights.T).T  # top
+            | _visible_from_start(heights[::-1].T).T[::-1])  # bottom
+
+
+def calc_visible_trees_array(grid):
+    """
+    Determines number of trees that are visible at the edges of the forest,
+        using NumPy array operations.
+
+    Inputs:
+        grid (ndarray): 2D array of tree heights
+
+    Returns:
+        (int): count of visible trees
+    """
+
+    return int(visibility_array(grid).sum())
+
+
+def _distances_from_start(heights):
+    """
+    Helper function for scenic_score_array. Determines how many trees each
+        tree can see looking along its row toward column 0. For each height,
+        the position of the last tree at least that tall is carried along the
+        row with a running maximum.
+
+    Inputs:
+        heights (ndarray): 2D int16 array of tree heights
+
+    Returns:
+        (ndarray): 2D int32 array of viewing distances
+    """
+
+    n_cols = heights.shape[1]
+    cols = np.arange(n_cols, dtype=np.int32)
+    distances = np.zeros(heights.shape, dtype=np.int32)  # column 0 sees 0
+
+    for h in range(int(heights.max()) + 1):
+        # position of the last tree at least h tall before each column;
+        # with none in the way, the edge at column 0 gives the same distance
+        before = np.maximum.accumulate(
+            (heights[:, :-1] >= h) * cols[:-1], axis=1)
+        np.copyto(distances[:, 1:], cols[1:] - before,
+                  where=(heights[:, 1:] == h))
+
+    return distances
+
+
+def scenic_score_array(grid):
+    """
+    Calculates the scenic score of every tree in the grid, using NumPy array
+        operations.
+
+    Inputs:
+        grid (ndarray): 2D array of tree heights
+
+    Returns:
+        (ndarray): 2D int64 array of scenic scores
+    """
+
+    heights = np.asarray(grid, dtype=np.int16)
+    if heights.size == 0:
+        return np.zeros(heights.shape, dtype=np.int64)
+
+    columns = np.ascontiguousarray(heights.T)
+    scores = _distances_from_start(heights).astype(np.int64)  # looking left
+    scores *= _distances_from_start(heights[:, ::-1])[:, ::-1]  # right
+    scores *= _distances_from_start(columns).T  # up
+    scores *= _distances_from_start(columns[:, ::-1])[:, ::-1].T  # down
+
+    return scores
+
+
+def calculate_max_scenic_score_array(grid):
+    """
+    Calculates the maximum scenic score of any tree in the grid, using NumPy
+        array operations.
+
+    Inputs:
+        grid (ndarray): 2D array of tree heights
+
+    Returns:
+        (int): maximum scenic score
+    """
+
+    scores = scenic_score_array(grid)
+    return int(scores.max()) if scores.size > 0 else 0
+
+
+def calc_visible_and_scenic_parallel(grid, processes=None, stripes=None):
+    """
+    Determines the number of visible trees and the maximum scenic score,
+        splitting the work across a process pool. The grid, the visibility
+        flags and the scenic scores live in shared memory, so workers read and
+        write them in place: first each worker looks along the rows of a
+        stripe of rows, then along the columns of a stripe of columns.
+
+    Inputs:
+        grid (ndarray): 2D array of tree heights
+        processes (int, optional): number of worker processes
+        stripes (int, optional): number of stripes to split the grid into;
+            defaults to four per worker process
+
+    Returns:
+        (int, int): tuple, count of visible trees and maximum scenic score
+    """
+
+    if np is None:
+        raise ImportError("numpy is required for the array engine")
+
+    grid = np.asarray(grid, dtype=np.uint8)
+    if grid.size == 0:
+        return 0, 0
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if stripes is None:
+        stripes = 4 * processes
+
+    n_rows, n_cols = grid.shape
+    blocks = []
+    try:
+        shared = {}
+        for key, dtype in (("grid", np.uint8), ("visible", np.bool_),
+                           ("scores", np.int64)):
+            block = shared_memory.SharedMemory(
+                create=True, size=grid.size * np.dtype(dtype).itemsize)
+            blocks.append(block)
+            shared[key] = (block.name, dtype)
+        _shared_array(blocks[0], grid.shape, np.uint8)[:] = grid
+
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            for axis, length in ((1, n_rows), (0, n_cols)):
+                bounds = np.linspace(0, length, min(stripes, length) + 1)
+                bounds = bounds.astype(int)
+                tasks = [(shared, grid.shape, axis, start, end)
+                         for start, end in zip(bounds[:-1], bounds[1:])]
+                list(pool.map(_stripe_pass, tasks))
+
+        count = int(_shared_array(blocks[1], grid.shape, np.bool_).sum())
+        max_score = int(_shared_array(blocks[2], grid.shape, np.int64).max())
+
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return count, max_score
+
+
+def _shared_array(block, shape, dtype):
+    """
+    Helper function viewing a shared memory block as an array.
+
+    Inputs:
+        block (SharedMemory): the shared memory block
+        shape (tuple): shape of the array
+        dtype (type): NumPy data type of the array
+
+    Returns:
+        (ndarray): array backed by the shared memory
+    """
+
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _stripe_pass(task):
+    """
+    Helper function for calc_visible_and_scenic_parallel. Looks along one
+        axis of a stripe of the shared grid, writing into the shared
+        visibility flags and scenic scores.
+
+    Inputs:
+        task (tuple): shared block names and types, grid shape, axis to look
+            along (1 for rows, 0 for columns), and start and end of the stripe
+
+    Returns:
+        (int): number of trees in the stripe
+    """
+
+    shared, shape, axis, start, end = task
+    blocks = {key: shared_memory.SharedMemory(name=name)
+              for key, (name, _) in shared.items()}
+
+    try:
+        grid, visible, scores = (
+            _shared_array(blocks[key], shape, shared[key][1])
+            for key in ("grid", "visible", "scores"))
+
+        if axis == 1:  # rows start:end, looking left and right
+            heights = grid[start:end].astype(np.int16)
+            visible[start:end] = (
+                _visible_from_start(heights)
+                | _visible_from_start(heights[:, ::-1])[:, ::-1])
+            scores[start:end] = (
+                _distances_from_start(heights).astype(np.int64)
+                * _distances_from_start(heights[:, ::-1])[:, ::-1])
+
+        else:  # columns start:end, looking up and down
+            heights = np.ascontiguousarray(grid[:, start:end].T, np.int16)
+            visible[:, start:end] |= (
+                _visible_from_start(heights)
+                | _visible_from_start(heights[:, ::-1])[:, ::-1]).T
+            scores[:, start:end] *= (
+                _distances_from_start(heights).astype(np.int64)
+                * _distances_from_start(heights[:, ::-1])[:, ::-1]).T
+
+        size = heights.size
+        del grid, visible, scores  # release the views before closing
+
+    finally:
+        for block in blocks.values():
+            block.close()
+
+    return size
+
+
+def map_input(file_path):
+    """
+    Memory-maps the input file as a 2D array of digit characters, using the
+        line ending at the end of each row as part of the row stride so
+        nothing is copied. Rows may end in "\n" or "\r\n".
+
+    Inputs:
+        file_path (str): file path where the input is located
+
+    Returns:
+        (ndarray): read-only 2D uint8 array of digit characters
+
+    Raises:
+        ValueError: if the rows have different widths or line endings
+    """
+
+    if np is None:
+        raise ImportError("numpy is required for the array engine")
+
+    if os.path.getsize(file_path) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    with open(file_path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    n_rows, width, eol = _grid_layout(data)
+    if n_rows == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    return np.ndarray((n_rows, width), dtype=np.uint8, buffer=data,
+                      strides=(width+eol, 1))
+
+
+def calc_visible_and_scenic_mmap(file_path, rows_per_block=None,
+                                 scratch_dir=None, block_bytes=1 << 24):
+    """
+    Determines the number of visible trees and the maximum scenic score for
+        a grid file too large to load, in two streaming passes over the
+        memory-mapped file.
+
+    The first pass goes from the bottom row up, looking down; for each tree
+        it writes the viewing distance and whether the tree is visible from
+        the bottom, packed into one small integer, to a scratch file on disk.
+        The second pass goes in file order, looking up, left and right, and
+        combines them. Between rows, only the tallest tree so far and the
+        nearest row holding a tree of at least each height are kept for each
+        column, so memory holds a block of rows and a few rows of column
+        state.
+
+    Inputs:
+        file_path (str): file path where the input is located
+        rows_per_block (int, optional): number of rows to read at a time; by
+            default, as many as keep the working arrays near block_bytes
+        scratch_dir (str, optional): directory for the scratch files
+        block_bytes (int): memory to aim for when sizing the blocks
+
+    Returns:
+        (int, int): tuple, count of visible trees and maximum scenic score
+
+    Raises:
+        ValueError: if the rows have different widths or line endings
+    """
+
+    digits = map_input(file_path)
+    n_rows, n_cols = digits.shape
+    if digits.size == 0:
+        return 0, 0
+
+    if rows_per_block is None:
+        # the working arrays for a block take about 48 bytes per tree
+        rows_per_block = max(1, block_bytes // (48 * n_cols))
+
+    levels = np.arange(10, dtype=np.int16)[:, None]
+    cols = np.arange(n_cols)
+    blocks = [(start, min(start + rows_per_block, n_rows))
+              for start in range(0, n_rows, rows_per_block)]
+
+    # down distance shifted left one bit, visible-from-bottom flag in bit 0
+    packed_type = np.uint16 if n_rows <= 1 << 15 else np.uint32
+
+    with tempfile.TemporaryDirectory(dir=scratch_dir) as scratch:
+        down = np.memmap(os.path.join(scratch, "down"), dtype=packed_type,
+                         mode="w+", shape=digits.shape)
+
+        # first pass, bottom to top: look down
+        tallest = np.full(n_cols, -1, dtype=np.int16)
+        nearest = np.full((10, n_cols), n_rows-1, dtype=np.int64)
+        for start, end in reversed(blocks):
+            heights = digits[start:end].astype(np.int16) - ord("0")
+            block_down = np.empty(heights.shape, dtype=packed_type)
+
+            for k in range(end - start - 1, -1, -1):
+                row = heights[k]
+                block_down[k] = ((nearest[row, cols] - (start+k)) << 1
+                                 | (row > tallest))
+                tallest = np.maximum(tallest, row)
+                nearest[levels <= row] = start + k
+
+            down[start:end] = block_down
+
+        # second pass, top to bottom: look up, left and right, and combine
+        count = 0
+        max_score = 0
+        tallest[:] = -1
+        nearest[:] = 0
+        for start, end in blocks:
+            heights = digits[start:end].astype(np.int16) - ord("0")
+            block_down = np.array(down[start:end])
+            block_visible = ((block_down & 1).astype(np.bool_)
+                             | _visible_from_start(heights)
+                             | _visible_from_start(heights[:, ::-1])[:, ::-1])
+            block_scores = (_distances_from_start(heights).astype(np.int64)
+                            * _distances_from_start(heights[:, ::-1])[:, ::-1]
+                            * (block_down >> 1))
+
+            for k in range(end - start):
+                row = heights[k]
+                block_visible[k] |= row > tallest
+                tallest = np.maximum(tallest, row)
+                block_scores[k] *= (start+k) - nearest[row, cols]
+                nearest[levels <= row] = start + k
+
+            count += int(block_visible.sum())
+            max_score = max(max_score, int(block_scores.max()))
+
+        del down  # close the scratch file before removing it
+
+    return count, max_score
+
+
+def calculate_max_scenic_score_eight(grid):
+    """
+    Calculates the maximum scenic score of any tree in the grid when also
+        looking along the diagonals, multiplying eight viewing distances.
+
+    Inputs:
+        grid (list): list of list, representing a grid of trees
+
+    Returns:
+        (int): maximum scenic score
+    """
+
+    return max((max(row, default=0)
+                for row in scenic_score_map(grid, diagonals=True)), default=0)
+
+
 # SOLVE ADVENT CHALLENGE
 def main():
     """
@@ -280,7 +1098,7 @@ def main():
     grid = load_input(file_path)
 
     # Part 1 - Calculate number of trees with visibility
-    print(calc_visible_trees(grid))
+    print(calc_visible_trees_sweep(grid))
 
     # Part 2 - Calculate maximum scenic score
-    print(calculate_max_scenic_score(grid))
+    print(calculate_max_scenic_score_sweep(grid))
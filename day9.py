@@ -79,6 +79,12 @@
 # need to update the position of the tail if the step means the head is no
 # longer adjacent to the tail.
 
+import itertools
+
+# unit step of the head knot for each direction
+DIRECTIONS = {"R": (1, 0), "L": (-1, 0), "U": (0, 1), "D": (0, -1)}
+
+
 def load_input(file_path):
     """
     Loads input movement instructions for rope knots.
@@ -142,6 +148,72 @@ def move_knots(movements, knots=2):
     return len(tail_positions)
 
 
+def move_knots_segments(movements, knots=2):
+    """
+    Determine the number of locations tail visits in response to head's
+        movements, skipping ahead through long movements.
+
+    Once the rope lies straight behind the head along its movement, every
+        later step of the movement just moves the whole rope by one step. The
+        rest of the movement is then applied at once, and only the steps
+        before that are simulated knot by knot. The rope can only have
+        straightened on a step where the tail moved exactly with the head, so
+        the rope is only inspected then.
+
+    Inputs:
+        movements (list): list of directions and steps for heads to make
+        knots (int): number of knots in the rope
+
+    Returns:
+        count of positions tail visits at least once
+    """
+
+    knot_positions = [(0, 0)] * knots
+    tail_positions = {(0, 0)}
+
+    for direction, steps in movements:
+        dx, dy = DIRECTIONS[direction]
+        remaining = int(steps)
+
+        while remaining > 0:
+            tail_x, tail_y = knot_positions[-1]
+            remaining -= 1
+
+            # advance head knot one step, then the remaining knots - once a
+            # knot stays put, the knots behind it stay put too
+            head_x, head_y = knot_positions[0]
+            knot_positions[0] = knot = head_x + dx, head_y + dy
+            for i in range(1, knots):
+                if adjacent(knot, knot_positions[i]):
+                    break
+                knot_positions[i] = knot = move_knot(knot, knot_positions[i])
+            else:
+                tail_positions.add(knot)
+
+                # steady state - tail moved with the head and the rope lies
+                # straight behind it
+                if remaining > 0 and knot == (tail_x + dx, tail_y + dy) and \
+                        all(behind == (ahead[0] - dx, ahead[1] - dy)
+                            for ahead, behind in zip(
+                                knot_positions,
+                                itertools.islice(knot_positions, 1, None))):
+                    tail_x, tail_y = knot
+                    if dx != 0:  # moving horizontally
+                        tail_positions.update(zip(
+                            range(tail_x + dx, tail_x + dx*(remaining+1), dx),
+                            itertools.repeat(tail_y)))
+                    else:  # moving vertically
+                        tail_positions.update(zip(
+                            itertools.repeat(tail_x),
+                            range(tail_y + dy, tail_y + dy*(remaining+1), dy)))
+
+                    knot_positions = [(x + dx*remaining, y + dy*remaining)
+                                      for x, y in knot_positions]
+                    remaining = 0
+
+    return len(tail_positions)
+
+
 def move_knot(knot_one, knot_two):
     """
     Advances the position of knot two in response to the position of knot one,
@@ -219,7 +291,7 @@ def main():
     movements = load_input(file_path)
 
     # Part 1 - number of unique tail movements
-    print(move_knots(movements))
+    print(move_knots_segments(movements))
 
     # Part 2 - number of unique tail movements with 10 total knots
-    print(move_knots(movements, 10))
+    print(move_knots_segments(movements, 10))
@@ -1,3 +1,55 @@
+import array
+import bisect
+import collections
+import concurrent.futures
+import fnmatch
+import functools
+import gc
+import io
+import mmap
+import os
+import struct
+import sys
+import types
+import weakref
+
+# shared read-only stand-in for a directory with no subdirectories or files;
+# real dicts are only created once a child is added
+_NO_CHILDREN = types.MappingProxyType({})
+
+# weak references to size trackers, by id of the outermost directory they
+# track; a tracker holds its directories, so an id can't be reused while its
+# tracker is in use
+_TRACKERS = {}
+
+
+def _tracker_of(root):
+    """
+    Helper function for finding the size tracker of an outermost directory.
+
+    Inputs:
+        root (Directory): outermost directory
+
+    Returns:
+        (SizeTracker): the size tracker, None if the directory isn't tracked
+    """
+
+    ref = _TRACKERS.get(id(root))
+    return ref() if ref is not None else None
+
+
+def _forget_tracker(key, ref):
+    """
+    Helper function for dropping a size tracker that is no longer in use.
+
+    Inputs:
+        key (int): id of the outermost directory
+        ref (weakref): weak reference to the dropped tracker
+    """
+
+    if _TRACKERS.get(key) is ref:
+        del _TRACKERS[key]
+
 
 class File:
     """
@@ -7,8 +59,12 @@ class File:
     Attributes:
         name (str): name of the file
         size (int): size of the file
+        parent (Directory): directory containing the file, None if the file
+            has not been added to a directory
     """
 
+    __slots__ = ("size", "name", "parent")
+
     def __init__(self, size=0, name=""):
         """
         Initializes a file object.
@@ -19,7 +75,8 @@ class File:
         """
 
         self.size = size
-        self.name = name
+        self.name = sys.intern(name)
+        self.parent = None
 
     def __repr__(self):
         """
@@ -56,10 +113,23 @@ class Directory:
         name (str): name of the directory
         size (int): size of the directory, equal to the sum of the size of
             all subdirectories and files
-        subdirectories (lst): a list of directory objects within this directory
-        files (lst): list of file objects (leaf nodes) within this directory
+        subdirectories (dict_values): read-only view of the directory objects
+            within this directory; use add_directory and remove to change it
+        files (dict_values): read-only view of the file objects (leaf nodes)
+            within this directory; use add_file and remove to change it
+        parent (Directory): directory containing this directory, None for the
+            outermost directory
+
+    Subdirectories and files are stored in dicts keyed by name, in the order
+        they were added, so looking up or removing a child does not scan a
+        list. The dicts are only created once a child is added, and names are
+        interned, to keep large directory structures small in memory. Size
+        changes are pushed up the parent chain as objects are added or
+        removed, so sizes are always current.
     """
 
+    __slots__ = ("name", "parent", "__size", "__subdirs", "__files")
+
     def __init__(self, name=""):
         """
         Initializes a directory object.
@@ -69,10 +139,59 @@ class Directory:
             size (int): size of the directory
         """
 
-        self.name = name
+        self.name = sys.intern(name)
+        self.parent = None
         self.__size = 0
-        self.subdirectories = []
-        self.files = []
+        self.__subdirs = _NO_CHILDREN  # name -> Directory
+        self.__files = _NO_CHILDREN  # name -> File
+
+    def __getstate__(self):
+        """
+        Provides the state of a directory object for pickling.
+
+        Returns:
+            (tuple): name, parent, size, subdirectories and files
+        """
+
+        return (self.name, self.parent, self.__size, self.__subdirs or None,
+                self.__files or None)
+
+    def __setstate__(self, state):
+        """
+        Restores the state of a directory object when unpickling.
+
+        Inputs:
+            state (tuple): name, parent, size, subdirectories and files
+        """
+
+        name, self.parent, self.__size, subdirs, files = state
+        self.name = sys.intern(name)
+        self.__subdirs = subdirs or _NO_CHILDREN
+        self.__files = files or _NO_CHILDREN
+
+    @property
+    def subdirectories(self):
+        """
+        Gives the subdirectories within this directory, without copying them.
+
+        Returns:
+            (dict_values): read-only view of the directory objects, in the
+                order they were added
+        """
+
+        return self.__subdirs.values()
+
+    @property
+    def files(self):
+        """
+        Gives the files within this directory, without copying them.
+
+        Returns:
+            (dict_values): read-only view of the file objects, in the order
+                they were added
+        """
+
+        return self.__files.values()
 
     def __repr__(self):
         """
@@ -95,18 +214,64 @@ class Directory:
             (string): string representation of the directory structure
         """
 
-        s = "\t"*tab_count + \
-            "- {} (dir, size = {}) \n".format(self.name, self.__size)
+        s = io.StringIO()
+        self.render(s, tab_count=tab_count)
+        return s.getvalue()
 
-        for directory in self.subdirectories:
-            s += directory.__to_string(tab_count+1)
+    def render(self, stream=None, max_depth=None, min_size=0, tab_count=0):
+        """
+        Writes a representation of the directory structure to a text stream,
+            one line at a time. Uses an explicit stack holding one iterator per
+            level, so memory grows with the depth of the structure rather
+            than its size.
+
+        Inputs:
+            stream (file, optional): text stream to write to; defaults to
+                standard output
+            max_depth (int, optional): deepest level below this directory to
+                show; if not specified, everything is shown
+            min_size (int): files and subdirectories smaller than this are
+                left out
+            tab_count (int): indentation level of this directory
+        """
 
-        for file in self.files:
-            f = "\t"*(tab_count+1) + \
-                "- {} (file, size = {})\n".format(file.name, file.size)
-            s += f
+        if stream is None:
+            stream = sys.stdout
+        write = stream.write
 
-        return s
+        write("\t"*tab_count + "- {} (dir, size = {}) \n".format(
+            self.name, self.__size))
+        stack = [(self, 0, iter(self.__subdirs.values()))]
+
+        while stack:
+            directory, depth, subdirs = stack[-1]
+
+            if max_depth is None or depth < max_depth:
+                for subdir in subdirs:
+                    if subdir.__size >= min_size:
+                        break
+                else:
+                    subdir = None
+            else:
+                subdir = None
+
+            # descend into the next subdirectory
+            if subdir is not None:
+                write("\t"*(tab_count+depth+1) +
+                      "- {} (dir, size = {}) \n".format(
+                          subdir.name, subdir.__size))
+                stack.append(
+                    (subdir, depth+1, iter(subdir.__subdirs.values())))
+                continue
+
+            # subdirectories are done, so list the files
+            stack.pop()
+            if max_depth is None or depth < max_depth:
+                for file in directory.__files.values():
+                    if file.size >= min_size:
+                        write("\t"*(tab_count+depth+1) +
+                              "- {} (file, size = {})\n".format(
+                                  file.name, file.size))
 
     def __eq__(self, other):
         """
@@ -146,14 +311,15 @@ class Directory:
 
             # it's a subdirectory
             if "/" in new_path:
-                for subdir in self.subdirectories:
+                subdir = self.__subdirs.get(new_path[:new_path.index("/")])
+                if subdir is None:
+                    exists = False
+                else:
                     exists, obj_type = subdir.path_exists(new_path)
-                    if exists:
-                        break
 
             # it's a file
             else:
-                exists = File(0, new_path) in self.files
+                exists = new_path in self.__files
                 obj_type = "file"
 
         return exists, obj_type
@@ -188,7 +354,6 @@ class Directory:
             else:
                 message = self.__add_subfile(file, path[path.index("/")+1:])
 
-            self.update_size()
             return message
 
     def __add_subfile(self, file, path=""):
@@ -202,9 +367,12 @@ class Directory:
 
         """
         if path == "":
-            if file not in self.files:  # prevents duplicate files
-                self.files.append(file)
-                self.__size += file.size
+            if file.name not in self.__files:  # prevents duplicate files
+                if self.__files is _NO_CHILDREN:
+                    self.__files = {}
+                self.__files[file.name] = file
+                file.parent = self
+                self.__propagate_size(file.size)
                 return "SUCCESS: File successfully added"
             else:
                 return "ERROR: File already exists"
@@ -214,8 +382,7 @@ class Directory:
             new_dir = path[:path.index("/")]
             new_path = path[path.index("/")+1:]
 
-            new_dir_idx = self.subdirectories.index(Directory(new_dir))
-            return self.subdirectories[new_dir_idx].__add_subfile(file, new_path)
+            return self.__subdirs[new_dir].__add_subfile(file, new_path)
 
     def add_directory(self, directory, path=""):
         """
@@ -249,7 +416,6 @@ class Directory:
                 message = self.__add_subdir(
                     directory, path[path.index("/")+1:])
 
-            self.update_size()
             return message
 
     def __add_subdir(self, directory, path=""):
@@ -264,9 +430,14 @@ class Directory:
         """
 
         if path == "":
-            if directory not in self.subdirectories:  # prevents duplicate files
-                self.subdirectories.append(directory)
-                self.__size += directory.__size
+            # prevents duplicate directories
+            if directory.name not in self.__subdirs:
+                if self.__subdirs is _NO_CHILDREN:
+                    self.__subdirs = {}
+                self.__subdirs[directory.name] = directory
+                directory.parent = self
+                _TRACKERS.pop(id(directory), None)  # no longer outermost
+                self.__propagate_size(directory.__size, added=directory)
                 return "SUCCESS: Directory was successfully added"
             else:
                 return "ERROR: Directory already exists"
@@ -276,8 +447,7 @@ class Directory:
             new_dir = path[:path.index("/")]
             new_path = path[path.index("/")+1:]
 
-            new_dir_idx = self.subdirectories.index(Directory(new_dir))
-            self.subdirectories[new_dir_idx].__add_subdir(directory, new_path)
+            return self.__subdirs[new_dir].__add_subdir(directory, new_path)
 
     def remove(self, path):
         """
@@ -309,15 +479,13 @@ class Directory:
             path (str): path of object (file or directory) to remove
 
         Returns:
-            (int): 1 if the object was successfully removed, -1 otherwise
+            (int): the size of the removed object
         """
 
-        removed = 0
-
         # removing a file
         if "/" not in path:
-            remove_idx = self.files.index(File(0, path))
-            removed = self.files.pop(remove_idx).size
+            removed_obj = self.__files.pop(path)
+            removed = removed_obj.size
 
         # traversing a sub-directory
         else:
@@ -326,40 +494,173 @@ class Directory:
 
             # remove a directory
             if new_path == "":
-                dir_idx = self.subdirectories.index(Directory(new_dir))
-                removed = self.subdirectories.pop(dir_idx).__size
+                removed_obj = self.__subdirs.pop(new_dir)
+                removed = removed_obj.__size
 
             # recursively traverse to subdirectory or sub-file
             else:
-                dir_idx = self.subdirectories.index(Directory(new_dir))
-                removed = self.subdirectories[dir_idx].__remove_obj(new_path)
+                return self.__subdirs[new_dir].__remove_obj(new_path)
 
-        self.__size -= removed
+        removed_obj.parent = None
+        if isinstance(removed_obj, Directory):
+            self.__propagate_size(-removed, removed=removed_obj)
+        else:
+            self.__propagate_size(-removed)
         return removed
 
+    def __propagate_size(self, delta, added=None, removed=None):
+        """
+        Helper function for adding a change in size to this directory and
+            every directory above it, keeping the size tracker of the
+            outermost directory (if any) up to date.
+
+        Inputs:
+            delta (int): change in size
+            added (Directory, optional): subdirectory that was just added
+            removed (Directory, optional): subdirectory that was just removed
+        """
+
+        directory = self
+        root = self
+        while directory is not None:
+            directory.__size += delta
+            root = directory
+            directory = directory.parent
+
+        ref = _TRACKERS.get(id(root))
+        tracker = ref() if ref is not None else None
+        if tracker is None:
+            return
+
+        if removed is not None:
+            tracker.discard(removed)
+        if added is not None:
+            tracker.add(added)
+
+        if delta != 0:
+            directory = self
+            while directory is not None:
+                tracker.update(directory, directory.__size - delta)
+                directory = directory.parent
+
+    def track_sizes(self):
+        """
+        Starts keeping a size tracker for this directory and all of its
+            subdirectories, which later additions and removals keep up to
+            date. Only the outermost directory can be tracked. The tracker is
+            kept up to date for as long as it is in use; once it has been
+            dropped, calling this again builds a new one.
+
+        Returns:
+            (SizeTracker): the size tracker
+        """
+
+        if self.parent is not None:
+            raise ValueError("only the outermost directory can be tracked")
+
+        tracker = _tracker_of(self)
+        if tracker is None:
+            tracker = SizeTracker(self)
+            _TRACKERS[id(self)] = weakref.ref(
+                tracker, functools.partial(_forget_tracker, id(self)))
+
+        return tracker
+
     def update_size(self):
         """
         Updates the size of the main directory and it's subdirectories, where
             the size of each directory is equal to the sum of the sizes of each 
-            files in the directory
+            files in the directory. Sizes are kept current as objects are added
+            and removed, so this is only needed after file sizes are changed
+            in place.
 
         Returns:
             (int) size of the directory
         """
 
-        size = 0
+        # subdirectories are visited before the directories containing them
+        for directory, _ in self.walk_postorder():
+            size = 0
 
-        # get a count of all of the files
-        for file in self.files:
-            size += file.size
+            # get a count of all of the files
+            for file in directory.__files.values():
+                size += file.size
 
-        # get a count of all the files in the subdirectories
-        for subdir in self.subdirectories:
-            size += subdir.update_size()
+            # get a count of all the files in the subdirectories
+            for subdir in directory.__subdirs.values():
+                size += subdir.__size
+
+            directory.__size = size
+
+        # sizes may have changed anywhere, so rebuild the tracker
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        tracker = _tracker_of(root)
+        if tracker is not None:
+            tracker.rebuild(root)
 
-        self.__size = size
         return self.__size
 
+    def walk_preorder(self):
+        """
+        Walks this directory and all of its subdirectories, visiting each
+            directory before its subdirectories. Uses an explicit stack, so
+            deep directory structures don't hit the recursion limit.
+
+        Returns:
+            (generator): yields (Directory, int) tuples of each directory and
+                its depth below this directory
+        """
+
+        stack = [(self, 0)]
+        while stack:
+            directory, depth = stack.pop()
+            yield directory, depth
+
+            for subdir in reversed(directory.__subdirs.values()):
+                stack.append((subdir, depth+1))
+
+    def walk_postorder(self):
+        """
+        Walks this directory and all of its subdirectories, visiting each
+            directory after its subdirectories. Uses an explicit stack, so
+            deep directory structures don't hit the recursion limit.
+
+        Returns:
+            (generator): yields (Directory, int) tuples of each directory and
+                its depth below this directory
+        """
+
+        stack = [(self, 0, False)]
+        while stack:
+            directory, depth, visited = stack.pop()
+
+            if visited:  # subdirectories are done
+                yield directory, depth
+                continue
+
+            stack.append((directory, depth, True))
+            for subdir in reversed(directory.__subdirs.values()):
+                stack.append((subdir, depth+1, False))
+
+    def walk_breadth_first(self):
+        """
+        Walks this directory and all of its subdirectories level by level.
+
+        Returns:
+            (generator): yields (Directory, int) tuples of each directory and
+                its depth below this directory
+        """
+
+        queue = collections.deque([(self, 0)])
+        while queue:
+            directory, depth = queue.popleft()
+            yield directory, depth
+
+            for subdir in directory.__subdirs.values():
+                queue.append((subdir, depth+1))
+
     def get_file(self, path):
         """
         Gets the file at the stated path.
@@ -392,15 +693,13 @@ class Directory:
         """
 
         if "/" not in path:  # base case - we've reached the file name
-            file_idx = self.files.index(File(0, path))
-            return self.files[file_idx]
+            return self.__files[path]
 
         # recursively traversing to file location
         new_path = path[path.index("/")+1:]
         new_dir = path[:path.index("/")]
 
-        dir_idx = self.subdirectories.index(Directory(new_dir))
-        return self.subdirectories[dir_idx].__get_subfile(new_path)
+        return self.__subdirs[new_dir].__get_subfile(new_path)
 
     def get_directory(self, path):
         """
@@ -436,13 +735,175 @@ class Directory:
 
         new_path = path[path.index("/")+1:]
         subdir = path[:path.index("/")]
-        subdir_idx = self.subdirectories.index(Directory(subdir))
+        subdir = self.__subdirs[subdir]
 
         if (new_path == ""):
-            return self.subdirectories[subdir_idx]
+            return subdir
 
         else:
-            return self.subdirectories[subdir_idx].__get_subdirectory(new_path)
+            return subdir.__get_subdirectory(new_path)
+
+    def merge(self, other):
+        """
+        Merges the contents of another directory structure into this one by
+            path. Subdirectories with the same name are merged together, and
+            files already in this structure are kept, so merging the same
+            listing twice changes nothing. Subdirectories not already in this
+            structure are moved over from the other structure, so the other
+            structure should not be used afterwards.
+
+        Inputs:
+            other (Directory): directory structure to merge into this one
+        """
+
+        stack = [(self, other)]
+        while stack:
+            target, source = stack.pop()
+
+            for file in source.__files.values():
+                if file.name not in target.__files:
+                    target.add_file(File(file.size, file.name))
+
+            for subdir in list(source.__subdirs.values()):
+                existing = target.__subdirs.get(subdir.name)
+                if existing is None:
+                    target.add_directory(subdir)
+                else:
+                    stack.append((existing, subdir))
+
+    def listing(self):
+        """
+        Lists the contents of this directory structure without nesting, so it
+            can be pickled however deep the structure is and merged into
+            another structure with merge_listing.
+
+        Returns:
+            (list): one (parent, name, file_names, file_sizes, files_size)
+                tuple for this directory and each subdirectory, directories
+                listed before their subdirectories. parent is the position of
+                the containing directory in the list (-1 for this directory),
+                file_names the names of the directory's files joined by "\0",
+                file_sizes an array of their sizes and files_size their total.
+        """
+
+        listing = []
+        positions = {}
+
+        for directory, _ in self.walk_preorder():
+            positions[id(directory)] = len(listing)
+            parent = positions[id(directory.parent)] if directory is not self \
+                else -1
+
+            files = directory.__files.values()
+            sizes = array.array("q", [file.size for file in files])
+            listing.append((parent, directory.name,
+                            "\0".join([file.name for file in files]), sizes,
+                            sum(sizes)))
+
+        return listing
+
+    def merge_listing(self, listing):
+        """
+        Merges a listing from listing into this directory structure by path.
+            Directories already present are reused and files already present
+            are kept, so merging the same listing twice changes nothing.
+
+        Directories not already present get all of their files in one step,
+            with the size already totalled, and sizes are summed once at the
+            end rather than pushed up the parent chain for every entry. A size
+            tracker of the outermost directory is rebuilt afterwards.
+
+        Nothing becomes garbage while merging, so the cycle collector is
+            paused; otherwise it keeps rescanning the growing structure as
+            the new objects are created.
+
+        Inputs:
+            listing (list): directories and their files, see listing
+        """
+
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            self.__merge_listing(listing)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def __merge_listing(self, listing):
+        """
+        Helper function for merge_listing, doing the merge.
+
+        Inputs:
+            listing (list): directories and their files, see listing
+        """
+
+        directories = []  # by position in the listing
+        added = []  # size of the files added to each directory
+        for parent, name, file_names, file_sizes, files_size in listing:
+            if parent == -1:
+                directory = self
+            else:
+                parent_dir = directories[parent]
+                directory = parent_dir.__subdirs.get(name)
+                if directory is None:
+                    directory = Directory(name)
+                    directory.parent = parent_dir
+                    if parent_dir.__subdirs is _NO_CHILDREN:
+                        parent_dir.__subdirs = {}
+                    parent_dir.__subdirs[directory.name] = directory
+            directories.append(directory)
+
+            if not file_sizes:
+                added.append(0)
+
+            elif directory.__files is _NO_CHILDREN:  # all of the files are new
+                files = list(map(File, file_sizes, file_names.split("\0")))
+                for file in files:
+                    file.parent = directory
+                directory.__files = {file.name: file for file in files}
+                added.append(files_size)
+
+            else:
+                size = 0
+                for file_size, file_name in zip(file_sizes,
+                                                 file_names.split("\0")):
+                    if file_name not in directory.__files:
+                        file = File(file_size, file_name)
+                        file.parent = directory
+                        directory.__files[file.name] = file
+                        size += file_size
+                added.append(size)
+
+        # subdirectories are listed after their directories, so go backwards
+        for position in range(len(listing) - 1, 0, -1):
+            directories[position].__size += added[position]
+            added[listing[position][0]] += added[position]
+
+        directory = self
+        root = self
+        while directory is not None:
+            directory.__size += added[0]
+            root = directory
+            directory = directory.parent
+
+        ref = _TRACKERS.get(id(root))
+        tracker = ref() if ref is not None else None
+        if tracker is not None:
+            tracker.rebuild(root)
+
+    def get_subdirectory(self, name):
+        """
+        Gets a subdirectory directly within this directory.
+
+        Inputs:
+            name (str): name of the subdirectory
+
+        Returns:
+            (Directory): subdirectory object with the name, None if this
+                directory doesn't contain it
+        """
+
+        return self.__subdirs.get(name)
 
     def num_files(self):
         """
@@ -451,7 +912,7 @@ class Directory:
         Returns:
             (int) count of file objects this directory contains
         """
-        return len(self.files)
+        return len(self.__files)
 
     def num_subdirectories(self):
         """
@@ -460,7 +921,7 @@ class Directory:
         Returns:
             (int) count of subdirectory objects this directory contains
         """
-        return len(self.subdirectories)
+        return len(self.__subdirs)
 
     def get_size(self):
         """
@@ -472,3 +933,708 @@ class Directory:
         """
 
         return self.__size
+
+
+class SizeIndex:
+    """
+    Provides a sorted index of directory sizes for answering size queries
+        with binary searches.
+
+    Attributes:
+        sizes (lst): directory sizes in increasing order
+        prefix_sums (lst): prefix_sums[i] is the sum of the first i sizes
+    """
+
+    def __init__(self, sizes=()):
+        """
+        Initializes a size index.
+
+        Inputs:
+            sizes (iterable): directory sizes to index
+        """
+
+        self.sizes = sorted(sizes)
+        self.prefix_sums = [0]
+        for size in self.sizes:
+            self.prefix_sums.append(self.prefix_sums[-1] + size)
+
+    @classmethod
+    def from_directory(cls, directory):
+        """
+        Builds a size index of every subdirectory of a directory (not
+            including the directory itself) in one pass.
+
+        Inputs:
+            directory (Directory): directory whose subdirectories to index
+
+        Returns:
+            (SizeIndex): index of the subdirectory sizes
+        """
+
+        return cls(d.get_size() for d, depth in directory.walk_postorder()
+                   if depth > 0)
+
+    def __len__(self):
+        """
+        Overrides default length for a size index.
+
+        Returns:
+            (int): number of indexed sizes
+        """
+
+        return len(self.sizes)
+
+    def sum_at_most(self, threshold):
+        """
+        Sums the sizes that are at most the threshold.
+
+        Inputs:
+            threshold (int): max size under consideration
+
+        Returns:
+            (int): sum of sizes <= threshold
+        """
+
+        return self.prefix_sums[bisect.bisect_right(self.sizes, threshold)]
+
+    def smallest_at_least(self, needed, default=None):
+        """
+        Finds the smallest size that is at least the size needed.
+
+        Inputs:
+            needed (int): min size under consideration
+            default (optional): value returned if no size is large enough
+
+        Returns:
+            (int): smallest size >= needed, default if there is none
+        """
+
+        idx = bisect.bisect_left(self.sizes, needed)
+        if idx == len(self.sizes):
+            return default
+
+        return self.sizes[idx]
+
+
+class SizeTracker:
+    """
+    Provides an index of directory sizes that is kept up to date as files and
+        directories are added and removed, for repeatedly asking for the
+        largest directories or the smallest directory of at least some size.
+        Created with Directory.track_sizes.
+
+    Sizes are kept in a sorted list, so queries are binary searches; each size
+        change moves one entry, which is a single memmove of the list.
+    """
+
+    def __init__(self, directory):
+        """
+        Initializes a size tracker.
+
+        Inputs:
+            directory (Directory): outermost directory to track
+        """
+
+        self.rebuild(directory)
+
+    def __len__(self):
+        """
+        Overrides default length for a size tracker.
+
+        Returns:
+            (int): number of tracked directories
+        """
+
+        return len(self.__keys)
+
+    def rebuild(self, directory):
+        """
+        Rebuilds the tracker from the current sizes of a directory and all of
+            its subdirectories.
+
+        Inputs:
+            directory (Directory): outermost directory to track
+        """
+
+        self.__nodes = {}  # id -> Directory
+        self.__keys = []  # sorted (size, id) tuples
+        for d, _ in directory.walk_preorder():
+            self.__nodes[id(d)] = d
+            self.__keys.append((d.get_size(), id(d)))
+        self.__keys.sort()
+
+    def add(self, directory):
+        """
+        Starts tracking a directory and all of its subdirectories.
+
+        Inputs:
+            directory (Directory): directory to track
+        """
+
+        for d, _ in directory.walk_preorder():
+            self.__nodes[id(d)] = d
+            bisect.insort(self.__keys, (d.get_size(), id(d)))
+
+    def discard(self, directory):
+        """
+        Stops tracking a directory and all of its subdirectories.
+
+        Inputs:
+            directory (Directory): directory to stop tracking
+        """
+
+        for d, _ in directory.walk_preorder():
+            if self.__nodes.pop(id(d), None) is not None:
+                self.__remove_key((d.get_size(), id(d)))
+
+    def update(self, directory, old_size):
+        """
+        Moves a tracked directory after its size changed.
+
+        Inputs:
+            directory (Directory): directory whose size changed
+            old_size (int): size of the directory before the change
+        """
+
+        self.__remove_key((old_size, id(directory)))
+        bisect.insort(self.__keys, (directory.get_size(), id(directory)))
+
+    def __remove_key(self, key):
+        """
+        Helper function to remove a (size, id) key from the sorted keys.
+
+        Inputs:
+            key (tuple): the key to remove
+        """
+
+        idx = bisect.bisect_left(self.__keys, key)
+        del self.__keys[idx]
+
+    def largest(self, n=1):
+        """
+        Finds the largest directories.
+
+        Inputs:
+            n (int): number of directories to find
+
+        Returns:
+            (lst): up to n directory objects, largest first
+        """
+
+        if n <= 0:
+            return []
+
+        return [self.__nodes[key[1]] for key in reversed(self.__keys[-n:])]
+
+    def smallest_at_least(self, needed):
+        """
+        Finds the smallest directory that is at least the size needed.
+
+        Inputs:
+            needed (int): min size under consideration
+
+        Returns:
+            (Directory): smallest directory with size >= needed, None if there
+                is none
+        """
+
+        idx = bisect.bisect_left(self.__keys, (needed,))
+        if idx == len(self.__keys):
+            return None
+
+        return self.__nodes[self.__keys[idx][1]]
+
+
+def scan_filesystem(root_path, follow_symlinks=False, exclude=(),
+                    max_workers=None):
+    """
+    Builds a directory structure from a real directory on disk. Directories
+        are listed with os.scandir across a thread pool, since the work is
+        I/O-bound, and file sizes are taken from stat results.
+
+    When following symlinks, each directory on disk is added only once. Real
+        (non-symlink) directories are scanned first, so a directory reached
+        both directly and through a symlink appears under its real name.
+        Symlinked directories are then taken one at a time in path order,
+        so the result doesn't depend on which thread finishes first; a
+        symlink to a directory that is already in the structure is left out.
+
+    Inputs:
+        root_path (str): path of the directory to scan
+        follow_symlinks (bool): if True, symlinks are followed to the files
+            and directories they point to; otherwise symlinks are treated as
+            files with the size of the link itself
+        exclude (iterable): glob patterns; files and directories whose names
+            match any pattern are skipped along with their contents
+        max_workers (int, optional): number of threads listing directories
+
+    Returns:
+        (Directory): directory structure rooted at root_path
+    """
+
+    exclude = tuple(exclude)
+    name = os.path.basename(os.path.normpath(root_path)) or root_path
+    main_dir = Directory(name)
+
+    # directories already in the structure, to avoid duplicates and cycles
+    seen = {_file_key(os.stat(root_path))}
+    links = []  # (path, parent Directory, name, key) of symlinked directories
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+        _scan_tree(pool, root_path, main_dir, follow_symlinks, exclude, seen,
+                   links)
+
+        # symlinks found while scanning a symlink are handled in a later round
+        while links:
+            found = sorted(links, key=lambda link: link[0])
+            links = []
+            for path, directory, dir_name, key in found:
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                subdir = Directory(dir_name)
+                directory.add_directory(subdir)
+                _scan_tree(pool, path, subdir, follow_symlinks, exclude, seen,
+                           links)
+
+    return main_dir
+
+
+def _scan_tree(pool, path, directory, follow_symlinks, exclude, seen, links):
+    """
+    Helper function for scan_filesystem. Scans a directory and the real
+        directories below it in parallel, setting symlinked directories
+        aside.
+
+    Inputs:
+        pool (ThreadPoolExecutor): thread pool listing directories
+        path (str): path of the directory to scan
+        directory (Directory): directory object to fill in
+        follow_symlinks (bool): whether to follow symlinks
+        exclude (tuple): glob patterns of names to skip
+        seen (set): keys of the directories already in the structure
+        links (list): list to add (path, parent, name, key) tuples of
+            symlinked directories to
+    """
+
+    pending = {pool.submit(_scan_entries, path, follow_symlinks,
+                           exclude): directory}
+
+    while pending:
+        done, _ = concurrent.futures.wait(
+            pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+        for future in done:
+            directory = pending.pop(future)
+            subdirs, files = future.result()
+
+            for file_name, size in files:
+                directory.add_file(File(size, file_name))
+
+            for dir_name, subdir_path, key, is_link in subdirs:
+                if is_link:
+                    links.append((subdir_path, directory, dir_name, key))
+                    continue
+
+                # real directories below one scan are all different, so this
+                # only skips directories added by an earlier scan
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                subdir = Directory(dir_name)
+                directory.add_directory(subdir)
+                pending[pool.submit(_scan_entries, subdir_path,
+                                    follow_symlinks, exclude)] = subdir
+
+
+def _scan_entries(path, follow_symlinks, exclude):
+    """
+    Helper function for scan_filesystem. Lists a single directory on disk.
+
+    Inputs:
+        path (str): path of the directory to list
+        follow_symlinks (bool): whether to follow symlinks
+        exclude (tuple): glob patterns of names to skip
+
+    Returns:
+        (lst, lst): tuple, list of (name, path, key, is_link) tuples for
+            subdirectories and list of (name, size) tuples for files; entries
+            that can't be read are skipped
+    """
+
+    subdirs = []
+    files = []
+
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if any(fnmatch.fnmatch(entry.name, p) for p in exclude):
+                    continue
+
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        st = entry.stat(follow_symlinks=follow_symlinks)
+                        subdirs.append((entry.name, entry.path, _file_key(st),
+                                        entry.is_symlink()))
+                    else:
+                        st = entry.stat(follow_symlinks=follow_symlinks)
+                        files.append((entry.name, st.st_size))
+                except OSError:  # e.g. broken symlinks
+                    continue
+
+    except OSError:  # e.g. permission denied
+        pass
+
+    return subdirs, files
+
+
+def _file_key(st):
+    """
+    Helper function identifying a file on disk from its stat result.
+
+    Inputs:
+        st (os.stat_result): stat result of the file
+
+    Returns:
+        (tuple): (device, inode) of the file
+    """
+
+    return st.st_dev, st.st_ino
+
+
+# snapshot header: magic, number of nodes, size of the name pool in bytes
+SNAPSHOT_MAGIC = b"DIRSNAP2"
+# magic, number of nodes, length of the name pool, bytes per index
+SNAPSHOT_HEADER = struct.Struct("<8sqqq")
+# node table columns and their array typecodes, widest first so every column
+# stays aligned; "index" columns hold node indexes and name offsets or
+# lengths, stored 4 bytes wide unless the snapshot is too big for that
+SNAPSHOT_COLUMNS = (("size", "q"), ("parent", "index"),
+                    ("first_child", "index"), ("num_children", "index"),
+                    ("name_offset", "index"), ("name_len", "index"),
+                    ("is_dir", "B"))
+
+
+def save_snapshot(directory, file_path):
+    """
+    Saves a directory structure to a compact binary snapshot file.
+
+    The snapshot is a header, then a table of nodes stored column by column
+        as little-endian integers (see SNAPSHOT_COLUMNS), then a pool of UTF-8
+        names. Being little-endian on every host, snapshots can be moved
+        between hosts. Nodes are stored level by level with each directory's
+        children next to each other and sorted by name, so a child can be
+        found with a binary search. Node 0 is the directory itself, and is
+        also given as its own parent.
+
+    Inputs:
+        directory (Directory): directory structure to save
+        file_path (str): file path to write the snapshot to
+    """
+
+    columns = {name: array.array("Q" if typecode == "index" else typecode)
+               for name, typecode in SNAPSHOT_COLUMNS}
+    pool = bytearray()
+
+    def add_node(parent, size, is_dir, name):  # appends one row to the table
+        encoded = name.encode()
+        columns["parent"].append(parent)
+        columns["size"].append(size)
+        columns["is_dir"].append(is_dir)
+        columns["first_child"].append(0)
+        columns["num_children"].append(0)
+        columns["name_offset"].append(len(pool))
+        columns["name_len"].append(len(encoded))
+        pool.extend(encoded)
+
+    add_node(0, directory.get_size(), 1, directory.name)
+    queue = collections.deque([(directory, 0)])
+    while queue:
+        cur_dir, row = queue.popleft()
+        children = [(d.name, 1, d) for d in cur_dir.subdirectories]
+        children += [(f.name, 0, f) for f in cur_dir.files]
+        children.sort(key=lambda child: (child[0].encode(), child[1]))
+
+        columns["first_child"][row] = len(columns["parent"])
+        columns["num_children"][row] = len(children)
+        for name, is_dir, obj in children:
+            if is_dir:
+                queue.append((obj, len(columns["parent"])))
+                add_node(row, obj.get_size(), 1, name)
+            else:
+                add_node(row, obj.size, 0, name)
+
+    num_nodes = len(columns["parent"])
+    index_code = "I" if max(num_nodes, len(pool)) < 1 << 32 else "Q"
+
+    with open(file_path, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, num_nodes, len(pool),
+                                     array.array(index_code).itemsize))
+        for name, typecode in SNAPSHOT_COLUMNS:
+            column = columns.pop(name)  # free each column once written
+            if typecode == "index" and index_code != "Q":
+                column = array.array(index_code, column)
+            if sys.byteorder == "big":
+                column.byteswap()
+            column.tofile(f)
+        f.write(pool)
+
+
+def load_snapshot(file_path):
+    """
+    Loads a directory structure snapshot by memory-mapping the file.
+
+    Inputs:
+        file_path (str): file path of the snapshot
+
+    Returns:
+        (DirectorySnapshot): the mapped snapshot
+    """
+
+    return DirectorySnapshot(file_path)
+
+
+class DirectorySnapshot:
+    """
+    Provides read-only access to a directory structure snapshot written by
+        save_snapshot. The file is memory-mapped and queried in place, without
+        building File and Directory objects. On big-endian hosts the columns
+        are copied and byte-swapped on load, since they are stored
+        little-endian.
+
+    Attributes:
+        parent, size, is_dir, first_child, num_children, name_offset,
+            name_len (memoryview or array): node table columns, indexed by
+            node
+        pool (memoryview): UTF-8 names of all of the nodes
+    """
+
+    def __init__(self, file_path):
+        """
+        Initializes a snapshot by memory-mapping a snapshot file.
+
+        Inputs:
+            file_path (str): file path of the snapshot
+        """
+
+        with open(file_path, "rb") as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self.__mmap)
+        magic, self.__num_nodes, pool_len, index_size = \
+            SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("{} is not a directory snapshot".format(file_path))
+        index_code = "I" if index_size == 4 else "Q"
+
+        offset = SNAPSHOT_HEADER.size
+        for name, typecode in SNAPSHOT_COLUMNS:
+            if typecode == "index":
+                typecode = index_code
+            width = array.array(typecode).itemsize * self.__num_nodes
+            column = view[offset:offset+width].cast(typecode)
+            if sys.byteorder == "big":
+                swapped = array.array(typecode, column.tobytes())
+                swapped.byteswap()
+                column.release()
+                column = swapped
+            setattr(self, name, column)
+            offset += width
+        self.pool = view[offset:offset+pool_len]
+
+    def __len__(self):
+        """
+        Overrides default length for a snapshot.
+
+        Returns:
+            (int): number of nodes (files and directories) in the snapshot
+        """
+
+        return self.__num_nodes
+
+    def close(self):
+        """
+        Releases the memory-mapped file.
+        """
+
+        for name, _ in SNAPSHOT_COLUMNS + (("pool", None),):
+            column = getattr(self, name)
+            if isinstance(column, memoryview):
+                column.release()
+        self.__mmap.close()
+
+    def __enter__(self):
+        """
+        Allows a snapshot to be used as a context manager.
+
+        Returns:
+            (DirectorySnapshot): this snapshot
+        """
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Releases the memory-mapped file when leaving a with block.
+        """
+
+        self.close()
+
+    def get_name(self, node=0):
+        """
+        Gets the name of a node.
+
+        Inputs:
+            node (int): index of the node
+
+        Returns:
+            (str): name of the file or directory
+        """
+
+        offset = self.name_offset[node]
+        return bytes(self.pool[offset:offset+self.name_len[node]]).decode()
+
+    def get_size(self, node=0):
+        """
+        Gets the size of a node, where the size of a directory is the sum of
+            the sizes of each subdirectory and file.
+
+        Inputs:
+            node (int): index of the node
+
+        Returns:
+            (int): size of the file or directory
+        """
+
+        return self.size[node]
+
+    def find(self, path):
+        """
+        Finds the node at a path, using the same path format as Directory:
+            directory paths end in "/" and start with the outermost directory.
+
+        Inputs:
+            path (str): path of the subdirectory or file to find
+
+        Returns:
+            (int): index of the node, -1 if the path doesn't exist
+        """
+
+        if path == "":
+            return 0
+
+        parts = path.split("/")
+        is_dir = path.endswith("/")
+        if is_dir:
+            parts.pop()
+
+        if self.get_name(0) != parts[0]:
+            return -1
+
+        node = 0
+        for i, part in enumerate(parts[1:], 1):
+            node = self.__find_child(node, part.encode(),
+                                     1 if (is_dir or i < len(parts)-1) else 0)
+            if node == -1:
+                break
+
+        return node
+
+    def __find_child(self, node, name, is_dir):
+        """
+        Helper function to binary search the children of a directory node.
+
+        Inputs:
+            node (int): index of the directory node
+            name (bytes): encoded name of the child
+            is_dir (int): 1 to find a directory, 0 to find a file
+
+        Returns:
+            (int): index of the child, -1 if there is no such child
+        """
+
+        key = (name, is_dir)
+        lo = self.first_child[node]
+        hi = lo + self.num_children[node]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = self.name_offset[mid]
+            mid_key = (bytes(self.pool[offset:offset+self.name_len[mid]]),
+                       self.is_dir[mid])
+            if mid_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < self.first_child[node] + self.num_children[node]:
+            offset = self.name_offset[lo]
+            if (bytes(self.pool[offset:offset+self.name_len[lo]]) == name
+                    and self.is_dir[lo] == is_dir):
+                return lo
+
+        return -1
+
+    def path_exists(self, path=""):
+        """
+        Determines if a path to a subdirectory or file exists.
+
+        Inputs:
+            path (str): path of subdirectory or file to find
+
+        Returns:
+            (bool, str): tuple, true if path exists, false otherwise and type of
+                object the path goes to (file or directory)
+        """
+
+        node = self.find(path)
+        obj_type = "directory" if path == "" or path.endswith("/") else "file"
+        return node != -1, obj_type
+
+    def directory_sizes(self):
+        """
+        Gets the sizes of every subdirectory, not including the outermost
+            directory.
+
+        Returns:
+            (generator): yields the size of each subdirectory
+        """
+
+        is_dir = self.is_dir
+        size = self.size
+        for node in range(1, self.__num_nodes):
+            if is_dir[node]:
+                yield size[node]
+
+    def size_index(self):
+        """
+        Builds a size index of every subdirectory, for answering day 7 size
+            queries.
+
+        Returns:
+            (SizeIndex): index of the subdirectory sizes
+        """
+
+        return SizeIndex(self.directory_sizes())
+
+    def to_directory(self):
+        """
+        Rebuilds the directory structure as Directory and File objects.
+
+        Returns:
+            (Directory): the directory structure
+        """
+
+        nodes = [Directory(self.get_name(0))]
+        for node in range(1, self.__num_nodes):
+            parent = nodes[self.parent[node]]
+            if self.is_dir[node]:
+                obj = Directory(self.get_name(node))
+                parent.add_directory(obj)
+            else:
+                obj = File(self.size[node], self.get_name(node))
+                parent.add_file(obj)
+            nodes.append(obj)
+
+        return nodes[0]
@@ -0,0 +1,283 @@
+import heapq
+
+from day8 import line_distances
+from day8 import running_max
+
+
+class Forest:
+    """
+    Provides a grid of trees that can change one tree at a time, keeping the
+        count of visible trees and the scenic scores up to date.
+
+    Changing a tree only changes what is seen along its row and its column,
+        so each change recomputes the running maximums and viewing distances
+        of that one row and one column.
+
+    Attributes:
+        grid (lst): list of list, representing a grid of tree heights
+        n_rows (int): number of rows in the grid
+        n_cols (int): number of columns in the grid
+    """
+
+    def __init__(self, grid):
+        """
+        Initializes a forest.
+
+        Inputs:
+            grid (list): list of list, representing a grid of trees
+        """
+
+        self.grid = [list(row) for row in grid]
+        self.n_rows = len(self.grid)
+        self.n_cols = len(self.grid[0]) if self.n_rows > 0 else 0
+
+        def empty():  # a new n_rows x n_cols table
+            return [[0] * self.n_cols for _ in range(self.n_rows)]
+
+        # running maximums from each edge, not including the tree itself
+        self.__from_left = empty()
+        self.__from_right = empty()
+        self.__from_top = empty()
+        self.__from_bottom = empty()
+
+        # viewing distances in each direction
+        self.__up = empty()
+        self.__left = empty()
+        self.__right = empty()
+        self.__down = empty()
+
+        self.__visible = [[False] * self.n_cols for _ in range(self.n_rows)]
+        self.__visible_count = 0
+        self.__scores = empty()
+        # heap of (-score, row, column) holding every tree's current score,
+        # along with old scores that haven't been dropped yet
+        self.__best = []
+
+        for i in range(self.n_rows):
+            self.__update_row(i)
+        for j in range(self.n_cols):
+            self.__update_column(j)
+        for i in range(self.n_rows):
+            for j in range(self.n_cols):
+                self.__update_tree(i, j)
+        self.__rebuild_best()
+
+    def __repr__(self):
+        """
+        Overrides default representation for printing a forest.
+
+        Returns:
+            (str) string representation of the forest
+        """
+
+        return "\n".join("".join(str(h) for h in row) for row in self.grid)
+
+    def get_height(self, i, j):
+        """
+        Gets the height of a tree.
+
+        Inputs:
+            i (int): row of the tree
+            j (int): column of the tree
+
+        Returns:
+            (int): height of the tree
+        """
+
+        return self.grid[i][j]
+
+    def set_height(self, i, j, height):
+        """
+        Changes the height of a tree, updating the trees in its row and
+            column.
+
+        Inputs:
+            i (int): row of the tree
+            j (int): column of the tree
+            height (int): new height of the tree
+        """
+
+        if self.grid[i][j] == height:
+            return
+
+        self.grid[i][j] = height
+        self.__update_row(i)
+        self.__update_column(j)
+
+        for k in range(self.n_cols):
+            self.__update_tree(i, k)
+        for k in range(self.n_rows):
+            if k != i:
+                self.__update_tree(k, j)
+
+        # drop old scores once they outnumber the current ones
+        if len(self.__best) > 4 * self.n_rows * self.n_cols:
+            self.__rebuild_best()
+
+    def is_visible(self, i, j):
+        """
+        Determines if a tree is visible from outside the grid.
+
+        Inputs:
+            i (int): row of the tree
+            j (int): column of the tree
+
+        Returns:
+            (bool): True if the tree is visible
+        """
+
+        return self.__visible[i][j]
+
+    def visible_count(self):
+        """
+        Determines number of trees that are visible at the edges of the forest.
+
+        Returns:
+            (int): count of visible trees
+        """
+
+        return self.__visible_count
+
+    def scenic_score(self, i, j):
+        """
+        Gets the scenic score of a tree.
+
+        Inputs:
+            i (int): row of the tree
+            j (int): column of the tree
+
+        Returns:
+            (int): scenic score of the tree
+        """
+
+        return self.__scores[i][j]
+
+    def viewing_distances(self, i, j):
+        """
+        Gets how many trees a tree can see in each direction.
+
+        Inputs:
+            i (int): row of the tree
+            j (int): column of the tree
+
+        Returns:
+            (tuple): viewing distances looking up, left, right and down
+        """
+
+        return (self.__up[i][j], self.__left[i][j], self.__right[i][j],
+                self.__down[i][j])
+
+    def top_scenic_sites(self, k=1):
+        """
+        Finds the trees with the highest scenic scores, popping the best k
+            off the heap of scores kept for max_scenic_score rather than
+            looking at every tree. Old scores popped on the way are dropped.
+
+        Inputs:
+            k (int): number of trees to find
+
+        Returns:
+            (list): up to k (score, row, column) tuples, highest score first;
+                ties are listed in grid order
+        """
+
+        sites = []
+        found = set()
+        while self.__best and len(sites) < k:
+            score, i, j = heapq.heappop(self.__best)
+            # skip old scores, and repeats of a score a tree had before
+            if -score == self.__scores[i][j] and (i, j) not in found:
+                found.add((i, j))
+                sites.append((-score, i, j))
+
+        for score, i, j in sites:  # put the current scores back
+            heapq.heappush(self.__best, (-score, i, j))
+
+        return sites
+
+    def max_scenic_score(self):
+        """
+        Determines the maximum scenic score of any tree in the grid.
+
+        Returns:
+            (int): maximum scenic score
+        """
+
+        while self.__best:
+            score, i, j = self.__best[0]
+            if -score == self.__scores[i][j]:
+                return -score
+            heapq.heappop(self.__best)  # an old score
+
+        return 0
+
+    def __rebuild_best(self):
+        """
+        Helper function rebuilding the heap of scenic scores from the current
+            scores, dropping every old score.
+        """
+
+        self.__best = [(-self.__scores[i][j], i, j)
+                       for i in range(self.n_rows)
+                       for j in range(self.n_cols)]
+        heapq.heapify(self.__best)
+
+    def __update_row(self, i):
+        """
+        Helper function recomputing the running maximums and viewing distances
+            looking left and right along a row.
+
+        Inputs:
+            i (int): the row
+        """
+
+        heights = self.grid[i]
+        self.__from_left[i] = running_max(heights)
+        self.__from_right[i] = running_max(heights[::-1])[::-1]
+        self.__left[i] = line_distances(heights)
+        self.__right[i] = line_distances(heights[::-1])[::-1]
+
+    def __update_column(self, j):
+        """
+        Helper function recomputing the running maximums and viewing distances
+            looking up and down along a column.
+
+        Inputs:
+            j (int): the column
+        """
+
+        heights = [row[j] for row in self.grid]
+        tables = ((self.__from_top, running_max(heights)),
+                  (self.__from_bottom, running_max(heights[::-1])[::-1]),
+                  (self.__up, line_distances(heights)),
+                  (self.__down, line_distances(heights[::-1])[::-1]))
+
+        for table, column in tables:
+            for i, value in enumerate(column):
+                table[i][j] = value
+
+    def __update_tree(self, i, j):
+        """
+        Helper function recomputing whether a tree is visible and its scenic
+            score from the cached rows and columns.
+
+        Inputs:
+            i (int): row of the tree
+            j (int): column of the tree
+        """
+
+        tree = self.grid[i][j]
+        visible = (tree > self.__from_left[i][j]
+                   or tree > self.__from_right[i][j]
+                   or tree > self.__from_top[i][j]
+                   or tree > self.__from_bottom[i][j])
+        self.__visible_count += visible - self.__visible[i][j]
+        self.__visible[i][j] = visible
+
+        score = (self.__up[i][j] * self.__left[i][j]
+                 * self.__right[i][j] * self.__down[i][j])
+        # the heap already holds every unchanged score
+        if score != self.__scores[i][j]:
+            heapq.heappush(self.__best, (-score, i, j))
+        self.__scores[i][j] = score
+